@@ -16,12 +16,20 @@ AI_UPDATE_INTERVAL = 2.0  # Seconds between AI decision updates
 MAX_VEHICLES = 50
 SPAWN_CHANCE = 0.1
 MIN_SPAWN_VEHICLES = 20
+COMMAND_SLOTS = 1024     # Capacity of the kernel command ring
 
 ACCELERATION = 10.0      # units/s^2
 DECELERATION = 30.0      # units/s^2
 MAX_SPEED = 15.0
 MIN_SPEED = 5.0
 
+# Braking Model
+BRAKING_DISTANCE = 150.0     # Beyond this distance to a stop target, speed is held (no braking, no acceleration)
+SAFE_SPEED_FACTOR = 0.8      # Fraction of the kinematic stopping speed sqrt(2 * DECELERATION * d) held as safe
+MAX_BRAKE_FACTOR = 1.5       # Hardest braking, as a multiple of DECELERATION
+APPROACH_SPEED_FACTOR = 0.9  # Keep accelerating towards a stop only below this fraction of the safe speed
+STOP_SNAP_DISTANCE = 1.0     # Closer than this, a vehicle is placed on its stop position
+
 # Traffic Rules
 STOP_OFFSET = 35.0       # Distance from intersection center to stop line
 MIN_GAP = 8.0            # Minimum gap between vehicles
@@ -0,0 +1,136 @@
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from backend.domain.models import Intersection, SignalState, IntersectionMode
+from backend.domain import config
+
+class SignalCode(IntEnum):
+    """Signal codes stored in the table; the str SignalState is only used at the API boundary."""
+    RED = 0
+    YELLOW = 1
+    GREEN = 2
+
+RED, YELLOW, GREEN = SignalCode
+SIGNAL_STATES = tuple(SignalState[code.name] for code in SignalCode)  # SIGNAL_STATES[code] -> SignalState
+SIGNAL_CODES = {state: SignalCode[state.name] for state in SIGNAL_STATES}
+# Bit per signal code that means "stop": (STOP_MASK >> sig) & 1
+STOP_MASK = int((1 << RED) | (1 << YELLOW))
+
+# PHASE_TABLE[ns_sig, ew_sig] -> (next ns_sig, next ew_sig, timer source) for an expired phase
+TIMER_YELLOW, TIMER_NS_GREEN, TIMER_EW_GREEN = range(3)
+PHASE_TABLE = np.zeros((3, 3, 3), dtype=np.uint8)
+for _ew in (RED, YELLOW, GREEN):
+    PHASE_TABLE[GREEN, _ew] = (YELLOW, _ew, TIMER_YELLOW)
+    PHASE_TABLE[YELLOW, _ew] = (RED, GREEN, TIMER_EW_GREEN)
+PHASE_TABLE[RED, GREEN] = (RED, YELLOW, TIMER_YELLOW)
+PHASE_TABLE[RED, YELLOW] = (GREEN, RED, TIMER_NS_GREEN)
+PHASE_TABLE[RED, RED] = (GREEN, RED, TIMER_NS_GREEN)
+
+MODES = tuple(IntersectionMode)
+MODE_CODES = {mode: code for code, mode in enumerate(MODES)}
+# Modes whose phases advance on the timer (EMERGENCY_OVERRIDE holds its signals)
+TIMED_MODES = (IntersectionMode.FIXED, IntersectionMode.AI_OPTIMIZED, IntersectionMode.MANUAL)
+
+@dataclass(slots=True)
+class IntersectionTable:
+    """Structure-of-Arrays intersection store, row i is intersection ids[i] (I-101 is row 0)."""
+    ids: Tuple[str, ...] = ()
+    ns_sig: np.ndarray = field(init=False)
+    ew_sig: np.ndarray = field(init=False)
+    ns_green: np.ndarray = field(init=False)
+    ew_green: np.ndarray = field(init=False)
+    timer: np.ndarray = field(init=False)
+    mode: np.ndarray = field(init=False)
+    timed: np.ndarray = field(init=False)
+    stop_bits: np.ndarray = field(init=False)
+    centre: np.ndarray = field(init=False)
+    _index: Dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        n = len(self.ids)
+        self.ns_sig = np.zeros(n, dtype=np.uint8)
+        self.ew_sig = np.zeros(n, dtype=np.uint8)
+        self.ns_green = np.full(n, config.MIN_GREEN_TIME, dtype=np.float64)
+        self.ew_green = np.full(n, config.MIN_GREEN_TIME, dtype=np.float64)
+        self.timer = np.zeros(n, dtype=np.float64)
+        self.mode = np.full(n, MODE_CODES[IntersectionMode.FIXED], dtype=np.uint8)
+        self.timed = np.ones(n, dtype=bool)
+        # Bit 0 set: east-west (horizontal lane) traffic must stop; bit 1: north-south (vertical lane) traffic
+        self.stop_bits = np.zeros(n, dtype=np.uint8)
+        # Static centre positions, centre[lane_type, row]: along the horizontal axis (col) then vertical (row)
+        size = config.GRID_SIZE
+        self.centre = np.array([
+            [(idx % size) * config.INTERSECTION_SPACING for idx in range(n)],
+            [(idx // size) * config.INTERSECTION_SPACING for idx in range(n)]
+        ], dtype=np.float64).reshape(2, n)
+        self._index = {iid: i for i, iid in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def index(self, intersection_id: str) -> Optional[int]:
+        return self._index.get(intersection_id)
+
+    def update_stop_bits(self, idx=slice(None)):
+        """Re-derives stop_bits for the given rows; call after writing ns_sig/ew_sig."""
+        self.stop_bits[idx] = ((STOP_MASK >> self.ew_sig[idx]) & 1) | (((STOP_MASK >> self.ns_sig[idx]) & 1) << 1)
+
+    def set_mode(self, idx, mode: IntersectionMode):
+        """Sets the mode of one row (or a slice/mask of rows), keeping the timed column in sync."""
+        self.mode[idx] = MODE_CODES[mode]
+        self.timed[idx] = mode in TIMED_MODES
+
+    def columns(self) -> "IntersectionColumns":
+        """Copies the columns the API reports; the copies stay valid while the simulation keeps stepping."""
+        return IntersectionColumns(
+            self.ids, self.ns_sig.copy(), self.ew_sig.copy(), self.timer.copy(), self.mode.copy(),
+            self.ns_green.copy(), self.ew_green.copy()
+        )
+
+@dataclass(slots=True, frozen=True)
+class IntersectionColumns:
+    """Immutable copy of an IntersectionTable's reported columns, row i is intersection ids[i]."""
+    ids: Tuple[str, ...]
+    ns_sig: np.ndarray
+    ew_sig: np.ndarray
+    timer: np.ndarray
+    mode: np.ndarray
+    ns_green: np.ndarray
+    ew_green: np.ndarray
+
+    def to_model(self, idx: int) -> Intersection:
+        return Intersection.model_construct(
+            id=self.ids[idx],
+            nsSignal=SIGNAL_STATES[self.ns_sig[idx]],
+            ewSignal=SIGNAL_STATES[self.ew_sig[idx]],
+            timer=float(self.timer[idx]),
+            mode=MODES[self.mode[idx]],
+            nsGreenTime=float(self.ns_green[idx]),
+            ewGreenTime=float(self.ew_green[idx])
+        )
+
+    def to_models(self) -> List[Intersection]:
+        return [self.to_model(i) for i in range(len(self.ids))]
+
+def build_next_intersection_index() -> np.ndarray:
+    """Lookup [lane_id_int, dir_sign > 0, cell] -> row of the next intersection ahead, or -1.
+
+    A spatial hash with cell size INTERSECTION_SPACING: intersections sit on that regular grid, so each
+    cell holds exactly one candidate per travel direction and the lookup is O(1) for any GRID_SIZE.
+    cell = (position - GRID_BOUNDS_MIN) // INTERSECTION_SPACING. Cell c starts on intersection
+    position first + c, so travelling forward the next one is first + c + 1, backward first + c.
+    """
+    size = config.GRID_SIZE
+    spacing = config.INTERSECTION_SPACING
+    first = int(config.GRID_BOUNDS_MIN // spacing)
+    n_cells = int((config.GRID_BOUNDS_MAX - config.GRID_BOUNDS_MIN) // spacing) + 1
+    table = np.full((2 * size, 2, n_cells), -1, dtype=np.int32)
+    for lane in range(2 * size):
+        lane_idx = lane % size
+        for forward in (0, 1):
+            for cell in range(n_cells):
+                k = first + cell + forward
+                if k < 0 or k >= size: continue
+                table[lane, forward, cell] = lane_idx * size + k if lane < size else k * size + lane_idx
+    return table
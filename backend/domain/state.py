@@ -1,17 +1,30 @@
-from typing import List, Dict, Optional
-from pydantic import BaseModel, ConfigDict
-from backend.domain.models import Intersection, Vehicle, EmergencyVehicle
+from dataclasses import dataclass, field
+from typing import Optional
+import numpy as np
+from backend.domain.models import EmergencyVehicle
+from backend.domain.intersection_table import IntersectionTable, IntersectionColumns
+from backend.domain.vehicle_array import VehicleArray, VehicleColumns
 from backend.domain.graph import RoadNetwork
 
-class SimulationState(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
-
+@dataclass(slots=True)
+class SimulationState:
+    # Internal write model, touched every tick; Pydantic models are only built at the API boundary
     tick_id: int = 0
     time: float = 0.0
-    intersections: Dict[str, Intersection] = {}
-    vehicles: List[Vehicle] = []
+    intersections: IntersectionTable = field(default_factory=IntersectionTable)
+    vehicles: VehicleArray = field(default_factory=VehicleArray)
     emergency_vehicle: Optional[EmergencyVehicle] = None
     ai_enabled: bool = False
 
     # Graph based structure
     road_network: Optional[RoadNetwork] = None
+
+@dataclass(slots=True, frozen=True)
+class StateSnapshot:
+    # Read model published at the end of each tick: plain column copies, never mutated, so readers need
+    # no lock. API models are built from it on first read (see SimulationKernel.get_state)
+    tick_id: int
+    intersections: IntersectionColumns
+    vehicles: VehicleColumns
+    emergency: Optional[EmergencyVehicle]
+    lane_counts: np.ndarray
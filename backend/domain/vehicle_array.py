@@ -0,0 +1,124 @@
+from dataclasses import dataclass, field
+from typing import List
+import numpy as np
+from backend.domain.models import Vehicle
+from backend.domain import config
+
+# Lane encoding: H0..H4 -> 0..4, V0..V4 -> 5..9 (for the default GRID_SIZE of 5)
+LANE_IDS = [f"H{i}" for i in range(config.GRID_SIZE)] + [f"V{i}" for i in range(config.GRID_SIZE)]
+LANE_HORIZONTAL = 0
+LANE_VERTICAL = 1
+LANE_TYPE_NAMES = ("horizontal", "vertical")
+# dir_sign +1 travels towards increasing position (east/south), -1 towards decreasing (west/north);
+# names are looked up as DIRECTION_NAMES[lane_type][dir_sign > 0]
+DIRECTION_NAMES = (("west", "east"), ("north", "south"))
+
+def vehicle_id(vid: int) -> str:
+    return f"v-{vid}"
+
+def encode_lane(is_horizontal: np.ndarray, lane_idx: np.ndarray) -> np.ndarray:
+    return np.where(is_horizontal, lane_idx, config.GRID_SIZE + lane_idx)
+
+@dataclass(slots=True)
+class VehicleArray:
+    """Structure-of-Arrays vehicle store with a fixed capacity; slot i is live while alive[i] is set.
+
+    Columns are allocated once. Spawns take a slot from free_slots and departures hand it back, so
+    the steady state allocates nothing. Vehicles are numbered from a monotonic next_id; the string id
+    is only formatted at the API boundary (see vehicle_id).
+    """
+    capacity: int = config.MAX_VEHICLES
+    count: int = 0
+    next_id: int = 0
+    free_slots: List[int] = field(init=False)
+    vid: np.ndarray = field(init=False)
+    pos: np.ndarray = field(init=False)
+    speed: np.ndarray = field(init=False)
+    target_speed: np.ndarray = field(init=False)
+    lane_id_int: np.ndarray = field(init=False)
+    dir_sign: np.ndarray = field(init=False)
+    lane_type: np.ndarray = field(init=False)
+    alive: np.ndarray = field(init=False)
+
+    def __post_init__(self):
+        self.vid = np.zeros(self.capacity, dtype=np.int64)
+        self.pos = np.zeros(self.capacity, dtype=np.float64)
+        self.speed = np.zeros(self.capacity, dtype=np.float64)
+        self.target_speed = np.zeros(self.capacity, dtype=np.float64)
+        self.lane_id_int = np.zeros(self.capacity, dtype=np.int32)
+        self.dir_sign = np.zeros(self.capacity, dtype=np.int8)
+        self.lane_type = np.zeros(self.capacity, dtype=np.int8)
+        self.alive = np.zeros(self.capacity, dtype=bool)
+        # Popped from the end, so the lowest free slot is handed out first
+        self.free_slots = list(range(self.capacity - 1, -1, -1))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def extend(self, lane_id_int: np.ndarray, dir_sign: np.ndarray, pos: np.ndarray, speed: np.ndarray,
+               target_speed: np.ndarray) -> int:
+        """Writes a batch of new vehicles into free slots, returns how many fit."""
+        n = min(len(pos), len(self.free_slots))
+        if n == 0: return 0
+        slots = [self.free_slots.pop() for _ in range(n)]
+        self.vid[slots] = np.arange(self.next_id, self.next_id + n)
+        self.next_id += n
+        self.pos[slots] = pos[:n]
+        self.speed[slots] = speed[:n]
+        self.target_speed[slots] = target_speed[:n]
+        self.lane_id_int[slots] = lane_id_int[:n]
+        self.dir_sign[slots] = dir_sign[:n]
+        self.lane_type[slots] = np.where(lane_id_int[:n] < config.GRID_SIZE, LANE_HORIZONTAL, LANE_VERTICAL)
+        self.alive[slots] = True
+        self.count += n
+        return n
+
+    def release(self, slots: np.ndarray):
+        """Returns the given slots (already cleared in alive) to the free list."""
+        self.free_slots.extend(slots.tolist())
+        self.count -= len(slots)
+
+    def live_slots(self) -> np.ndarray:
+        return np.flatnonzero(self.alive)
+
+    def columns(self) -> "VehicleColumns":
+        """Copies the live vehicles' columns; the copies stay valid while the simulation keeps stepping."""
+        slots = self.live_slots()
+        return VehicleColumns(
+            self.vid[slots], self.pos[slots], self.speed[slots], self.target_speed[slots],
+            self.lane_id_int[slots], self.lane_type[slots], self.dir_sign[slots]
+        )
+
+@dataclass(slots=True, frozen=True)
+class VehicleColumns:
+    """Immutable copy of the live vehicles' columns, row k is the k-th live slot."""
+    vid: np.ndarray
+    pos: np.ndarray
+    speed: np.ndarray
+    target_speed: np.ndarray
+    lane_id_int: np.ndarray
+    lane_type: np.ndarray
+    dir_sign: np.ndarray
+
+    def to_models(self) -> List[Vehicle]:
+        vids = self.vid.tolist()
+        lanes = self.lane_id_int.tolist()
+        lane_types = self.lane_type.tolist()
+        signs = self.dir_sign.tolist()
+        positions = self.pos.tolist()
+        speeds = self.speed.tolist()
+        target_speeds = self.target_speed.tolist()
+        # Values come from our own columns, so Pydantic validation is skipped
+        return [
+            Vehicle.model_construct(
+                id=vehicle_id(vids[k]),
+                laneId=LANE_IDS[lanes[k]],
+                laneType=LANE_TYPE_NAMES[lane_types[k]],
+                direction=DIRECTION_NAMES[lane_types[k]][signs[k] > 0],
+                position=positions[k],
+                speed=speeds[k],
+                target_speed=target_speeds[k],
+                type="car"
+            )
+            for k in range(len(vids))
+        ]
@@ -1,18 +1,38 @@
-from collections import deque
-from typing import Deque
+from typing import Iterator, List, Optional
 from backend.kernel.commands import Command
+from backend.domain import config
 
 class CommandQueue:
-    def __init__(self):
-        self.queue: Deque[Command] = deque()
+    """Fixed-size single-producer/single-consumer ring of commands.
 
-    def add(self, command: Command):
-        self.queue.append(command)
+    The producer only advances head and the consumer only advances tail, so no lock is needed and
+    nothing is allocated per command. Slots are reused once drained.
+    """
+    def __init__(self, slots: int = config.COMMAND_SLOTS):
+        self.slots: List[Optional[Command]] = [None] * slots
+        self.head = 0  # total commands added
+        self.tail = 0  # total commands drained
 
-    def pop_all(self) -> Deque[Command]:
-        commands = self.queue
-        self.queue = deque()
-        return commands
+    def __len__(self) -> int:
+        return self.head - self.tail
+
+    def add(self, command: Command) -> bool:
+        """Queues a command, returns False (dropping it) if the ring is full."""
+        if self.head - self.tail >= len(self.slots): return False
+        self.slots[self.head % len(self.slots)] = command
+        self.head += 1
+        return True
+
+    def drain(self) -> Iterator[Command]:
+        """Yields the commands queued so far in order, freeing each slot as it goes."""
+        end = self.head
+        size = len(self.slots)
+        while self.tail < end:
+            idx = self.tail % size
+            command = self.slots[idx]
+            self.slots[idx] = None
+            self.tail += 1
+            yield command
 
     def clear(self):
-        self.queue.clear()
+        for _ in self.drain(): pass
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Any, Optional
-from backend.domain.models import IntersectionMode, SignalUpdate, SignalState
+from backend.domain.models import IntersectionMode, SignalUpdate
+from backend.domain import config
 
 class Command(ABC):
     @abstractmethod
@@ -13,14 +14,15 @@ class UpdateSignalCommand(Command):
         self.updates = updates
 
     def execute(self, kernel: Any):
-        intersection = kernel.state.intersections.get(self.intersection_id)
-        if intersection:
+        tbl = kernel.state.intersections
+        idx = tbl.index(self.intersection_id)
+        if idx is not None:
             if self.updates.nsGreenTime is not None:
-                intersection.nsGreenTime = self.updates.nsGreenTime
+                tbl.ns_green[idx] = self.updates.nsGreenTime
             if self.updates.ewGreenTime is not None:
-                intersection.ewGreenTime = self.updates.ewGreenTime
+                tbl.ew_green[idx] = self.updates.ewGreenTime
             if self.updates.mode is not None:
-                intersection.mode = self.updates.mode
+                tbl.set_mode(idx, self.updates.mode)
 
 class SetGlobalAIModeCommand(Command):
     def __init__(self, enabled: bool):
@@ -29,39 +31,28 @@ class SetGlobalAIModeCommand(Command):
     def execute(self, kernel: Any):
         kernel.state.ai_enabled = self.enabled
         new_mode = IntersectionMode.AI_OPTIMIZED if self.enabled else IntersectionMode.FIXED
-        for intersection in kernel.state.intersections.values():
-            intersection.mode = new_mode
+        kernel.state.intersections.set_mode(slice(None), new_mode)
 
 class SpawnVehicleCommand(Command):
     def execute(self, kernel: Any):
         # Force a spawn attempt
-        kernel._spawn_vehicle()
+        kernel._spawn_batch(1)
+
+# (nsGreenTime, ewGreenTime) per pattern; unknown patterns fall back to the minimum green time
+TRAFFIC_PATTERNS = {
+    "rush_hour": (40.0, 20.0),
+    "night_mode": (config.MIN_GREEN_TIME, config.MIN_GREEN_TIME),
+    "event": (35.0, 35.0),
+    "holiday": (20.0, 20.0),
+}
 
 class ApplyTrafficPatternCommand(Command):
     def __init__(self, pattern: str):
         self.pattern = pattern
+        self.ns_green, self.ew_green = TRAFFIC_PATTERNS.get(pattern, (config.MIN_GREEN_TIME, config.MIN_GREEN_TIME))
 
     def execute(self, kernel: Any):
-        ns_green = 10.0
-        ew_green = 10.0
-
-        if self.pattern == "rush_hour":
-            ns_green, ew_green = 40.0, 20.0
-        elif self.pattern == "night_mode":
-            ns_green, ew_green = 10.0, 10.0
-        elif self.pattern == "event":
-            ns_green, ew_green = 35.0, 35.0
-        elif self.pattern == "holiday":
-            ns_green, ew_green = 20.0, 20.0
-
-        for intersection in kernel.state.intersections.values():
-            intersection.nsGreenTime = float(ns_green)
-            intersection.ewGreenTime = float(ew_green)
-            # Reset timer based on current active phase
-            if intersection.nsSignal in [SignalState.GREEN, SignalState.YELLOW]:
-                 intersection.timer = float(ns_green)
-            else:
-                 intersection.timer = float(ew_green)
+        kernel.apply_green_times(self.ns_green, self.ew_green)
 
 class StartEmergencyCommand(Command):
     def execute(self, kernel: Any):
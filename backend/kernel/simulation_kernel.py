@@ -1,79 +1,114 @@
+import logging
 import random
-from typing import Dict, List, Optional
+from typing import Optional
+import numpy as np
 from backend.domain.models import (
-    Intersection, Vehicle, EmergencyVehicle, SignalState, IntersectionMode, GridState, RoadOverview, ZoneOverview, GridOverview
+    EmergencyVehicle, Intersection, IntersectionMode, SignalState, GridState, RoadOverview, ZoneOverview, GridOverview
 )
-from backend.domain.state import SimulationState
+from backend.domain.intersection_table import (
+    IntersectionTable, RED, GREEN, PHASE_TABLE, build_next_intersection_index
+)
+from backend.domain.state import SimulationState, StateSnapshot
+from backend.domain.vehicle_array import VehicleArray, LANE_IDS, encode_lane
 from backend.kernel.command_queue import CommandQueue
+from backend.kernel.vehicle_physics import make_step_kernel, group_by_lane, warm_up
 from backend.domain import config
 
+ZONES = {
+    "North Industrial": ["H0", "H1", "V0", "V4"],
+    "Central District": ["H2", "H3", "V2", "V3"],
+    "West Harbor": ["V0", "V1", "H4"]
+}
+FLOW_STATUS = ("optimal", "moderate", "congested")
+
+logger = logging.getLogger(__name__)
+
 class SimulationKernel:
     def __init__(self):
         self.state = SimulationState()
         self.dt = 0.05
         self.command_queue = CommandQueue()
         self.initialized = False
-        self._vehicle_lane_cache: Dict[str, List[Vehicle]] = {}
+        self.random = random.Random(42)  # scalar draws (spawn gate)
+        self.rng = np.random.default_rng(42)  # batched draws (grid init, spawns)
+        self._next_int_idx = build_next_intersection_index()
+        n_groups = len(LANE_IDS) * 2
+        self._group_count = np.zeros(n_groups, dtype=np.int64)
+        self._group_offset = np.zeros(n_groups + 1, dtype=np.int64)
+        self._perm = np.zeros(config.MAX_VEHICLES, dtype=np.int64)
+        self._order_valid = False
+        # Live vehicles per lane, kept up to date on spawn and exit
+        self._lane_counts = np.zeros(len(LANE_IDS), dtype=np.int32)
+        # Zone x lane 0/1 membership, so zone loads are one matrix-vector product
+        self._zones_matrix = np.array([[lane_id in lanes for lane_id in LANE_IDS] for lanes in ZONES.values()], dtype=np.float64)
+        self._zones_lane_counts = np.maximum(1.0, self._zones_matrix.sum(axis=1))
+        # Overview is a pure function of the tick, so it is built at most once per tick
+        self._overview_cache = None
+        self._overview_tick = -1
+        self._snapshot = None
+        self._grid_state = (None, None)  # (snapshot, its GridState), built on first read
+        self._state_json = (None, b"")  # (snapshot, its GridState JSON)
+        self._step_vehicles = make_step_kernel(
+            config.ACCELERATION, config.DECELERATION, config.MIN_GAP, config.STOP_OFFSET,
+            config.INTERSECTION_SPACING, config.GRID_BOUNDS_MIN, config.GRID_BOUNDS_MAX,
+            config.BRAKING_DISTANCE, config.SAFE_SPEED_FACTOR, config.MAX_BRAKE_FACTOR,
+            config.APPROACH_SPEED_FACTOR, config.STOP_SNAP_DISTANCE
+        )
+        warm_up(self._step_vehicles)
 
     def initialize(self, seed: int = 42):
         self.state.tick_id = 0
         self.state.time = 0.0
-        random.seed(seed)
+        self._overview_tick = -1
+        self.random.seed(seed)
+        self.rng = np.random.default_rng(seed)
         self._initialize_grid()
         self._initialize_vehicles()
         self.initialized = True
-        print(f"Kernel Initialized (Seed: {seed})")
+        self._publish()
+        logger.info("Kernel Initialized (Seed: %s)", seed)
 
     def _initialize_grid(self):
-        self.state.intersections = {}
-        for i in range(1, 26):
-            intersection_id = f"I-{100 + i}"
-            start_ns = random.choice([SignalState.GREEN, SignalState.RED])
-            start_ew = SignalState.RED if start_ns == SignalState.GREEN else SignalState.GREEN
-            self.state.intersections[intersection_id] = Intersection(
-                id=intersection_id,
-                nsSignal=start_ns,
-                ewSignal=start_ew,
-                timer=float(random.randint(5, 10)),
-                mode=IntersectionMode.FIXED,
-                nsGreenTime=config.MIN_GREEN_TIME,
-                ewGreenTime=config.MIN_GREEN_TIME
-            )
+        tbl = IntersectionTable(ids=tuple(f"I-{100 + i}" for i in range(1, config.GRID_SIZE ** 2 + 1)))
+        ns_starts_green = self.rng.integers(0, 2, len(tbl)).astype(bool)
+        tbl.ns_sig[:] = np.where(ns_starts_green, GREEN, RED)
+        tbl.ew_sig[:] = np.where(ns_starts_green, RED, GREEN)
+        tbl.update_stop_bits()
+        tbl.timer[:] = self.rng.integers(5, 11, len(tbl))
+        self.state.intersections = tbl
 
     def _initialize_vehicles(self):
-        self.state.vehicles = []
-        for i in range(10):
-            self._spawn_vehicle()
-
-    def _spawn_vehicle(self):
-        if len(self.state.vehicles) >= config.MAX_VEHICLES: return
-        is_horizontal = random.choice([True, False])
-        lane_idx = random.randint(0, 4)
-        lane_id = f"H{lane_idx}" if is_horizontal else f"V{lane_idx}"
-        direction = random.choice(["east", "west"]) if is_horizontal else random.choice(["north", "south"])
-
-        vehicle = Vehicle(
-            id=f"v-{self.state.tick_id}-{random.randint(100,999)}",
-            laneId=lane_id,
-            laneType="horizontal" if is_horizontal else "vertical",
-            direction=direction,
-            position=random.uniform(0, 500),
-            speed=random.uniform(config.MIN_SPEED, config.MAX_SPEED),
-            target_speed=random.uniform(config.MIN_SPEED, config.MAX_SPEED),
-            type="car"
+        self.state.vehicles = VehicleArray()
+        self._lane_counts[:] = 0
+        self._spawn_batch(10)
+
+    def _spawn_batch(self, n: int):
+        n = min(n, len(self.state.vehicles.free_slots))
+        if n <= 0: return
+        rng = self.rng
+        is_horizontal = rng.integers(0, 2, n).astype(bool)
+        lane_idx = rng.integers(0, config.GRID_SIZE, n)
+        dir_sign = rng.choice(np.array([-1, 1], dtype=np.int8), n)
+        lanes = encode_lane(is_horizontal, lane_idx)
+        np.add.at(self._lane_counts, lanes, 1)
+        self._order_valid = False
+
+        self.state.vehicles.extend(
+            lanes,
+            dir_sign,
+            rng.uniform(0, config.GRID_SIZE * config.INTERSECTION_SPACING, n),
+            rng.uniform(config.MIN_SPEED, config.MAX_SPEED, n),
+            rng.uniform(config.MIN_SPEED, config.MAX_SPEED, n)
         )
-        self.state.vehicles.append(vehicle)
 
-    def queue_command(self, command):
-        self.command_queue.add(command)
+    def queue_command(self, command) -> bool:
+        return self.command_queue.add(command)
 
     def run_tick(self):
         if not self.initialized: self.initialize()
 
         # 1. Process Commands
-        commands = self.command_queue.pop_all()
-        while commands:
-            cmd = commands.popleft()
+        for cmd in self.command_queue.drain():
             cmd.execute(self)
 
         # 2. Logic
@@ -86,181 +121,59 @@ class SimulationKernel:
         self.state.time += self.dt
         self.state.tick_id += 1
 
-        # 4. Spawning
-        if len(self.state.vehicles) < config.MIN_SPAWN_VEHICLES and random.random() < (config.SPAWN_CHANCE * self.dt):
-             if random.random() < config.SPAWN_CHANCE:
-                self._spawn_vehicle()
+        # 4. Spawning: one draw against the product of the two independent spawn chances
+        spawn_threshold = config.SPAWN_CHANCE * config.SPAWN_CHANCE * self.dt
+        if len(self.state.vehicles) < config.MIN_SPAWN_VEHICLES and self.random.random() < spawn_threshold:
+            self._spawn_batch(1)
+
+        # 5. Publish
+        self._publish()
 
     def _update_signals(self, dt):
-        for intersection in self.state.intersections.values():
-            if intersection.mode not in [IntersectionMode.FIXED, IntersectionMode.AI_OPTIMIZED, IntersectionMode.MANUAL]: continue
-            intersection.timer -= dt
-            if intersection.timer <= 0: self._switch_signal_phase(intersection)
-
-    def _switch_signal_phase(self, intersection):
-        if intersection.nsSignal == SignalState.GREEN:
-            intersection.nsSignal = SignalState.YELLOW
-            intersection.timer = config.YELLOW_TIME
-        elif intersection.nsSignal == SignalState.YELLOW:
-            intersection.nsSignal = SignalState.RED
-            intersection.ewSignal = SignalState.GREEN
-            intersection.timer = intersection.ewGreenTime
-        elif intersection.ewSignal == SignalState.GREEN:
-            intersection.ewSignal = SignalState.YELLOW
-            intersection.timer = config.YELLOW_TIME
-        elif intersection.ewSignal == SignalState.YELLOW:
-            intersection.ewSignal = SignalState.RED
-            intersection.nsSignal = SignalState.GREEN
-            intersection.timer = intersection.nsGreenTime
-        elif intersection.nsSignal == SignalState.RED and intersection.ewSignal == SignalState.RED:
-             intersection.nsSignal = SignalState.GREEN
-             intersection.timer = intersection.nsGreenTime
+        tbl = self.state.intersections
+        tbl.timer[tbl.timed] -= dt
+        expired = np.nonzero(tbl.timed & (tbl.timer <= 0))[0]
+        if expired.size: self._switch_signal_phase(expired)
+
+    def _switch_signal_phase(self, idx):
+        tbl = self.state.intersections
+        new_ns, new_ew, timer_src = PHASE_TABLE[tbl.ns_sig[idx], tbl.ew_sig[idx]].T
+        tbl.ns_sig[idx] = new_ns
+        tbl.ew_sig[idx] = new_ew
+        tbl.update_stop_bits(idx)
+        tbl.timer[idx] = np.choose(timer_src, (config.YELLOW_TIME, tbl.ns_green[idx], tbl.ew_green[idx]))
+
+    def apply_green_times(self, ns_green: float, ew_green: float):
+        tbl = self.state.intersections
+        tbl.ns_green[:] = ns_green
+        tbl.ew_green[:] = ew_green
+        # Reset timer based on current active phase
+        tbl.timer[:] = np.where(tbl.ns_sig != RED, ns_green, ew_green)
 
     def _update_vehicles(self, dt):
-        self._vehicle_lane_cache = {}
-        for v in self.state.vehicles:
-            if v.laneId not in self._vehicle_lane_cache: self._vehicle_lane_cache[v.laneId] = []
-            self._vehicle_lane_cache[v.laneId].append(v)
-
-        for lane_id, lane_vehicles in self._vehicle_lane_cache.items():
-            direction_groups = {}
-            for v in lane_vehicles:
-                if v.direction not in direction_groups: direction_groups[v.direction] = []
-                direction_groups[v.direction].append(v)
-
-            for direction, vehicles in direction_groups.items():
-                if direction in ["east", "south"]: vehicles.sort(key=lambda v: v.position, reverse=True)
-                else: vehicles.sort(key=lambda v: v.position)
-
-                for i, v in enumerate(vehicles):
-                    self._update_single_vehicle(v, i, vehicles, direction, dt)
-
-                    # Respawn Logic
-                    if v.position > config.GRID_BOUNDS_MAX or v.position < config.GRID_BOUNDS_MIN:
-                         if v in self.state.vehicles:
-                            self.state.vehicles.remove(v)
-
-    def _update_single_vehicle(self, v, idx, lane_group, direction, dt):
-        target_speed = v.target_speed
-        stop_pos = -1.0
-
-        upcoming_int, dist_to_int = self._get_upcoming_intersection_info(v)
-
-        if upcoming_int:
-            should_stop = False
-            if "H" in v.laneId:
-                if upcoming_int.ewSignal in [SignalState.RED, SignalState.YELLOW]: should_stop = True
-            else:
-                if upcoming_int.nsSignal in [SignalState.RED, SignalState.YELLOW]: should_stop = True
-
-            if should_stop:
-                center_pos = self._get_intersection_pos(v, upcoming_int)
-                if direction in ["east", "south"]:
-                    stop_pos = center_pos - config.STOP_OFFSET
-                    if v.position > center_pos: stop_pos = -1.0
-                else:
-                    stop_pos = center_pos + config.STOP_OFFSET
-                    if v.position < center_pos: stop_pos = -1.0
-
-        if idx > 0:
-            lead_vehicle = lane_group[idx-1]
-            if direction in ["east", "south"]:
-                lead_stop_pos = lead_vehicle.position - config.MIN_GAP
-                if stop_pos == -1.0 or lead_stop_pos < stop_pos: stop_pos = lead_stop_pos
-            else:
-                lead_stop_pos = lead_vehicle.position + config.MIN_GAP
-                if stop_pos == -1.0 or lead_stop_pos > stop_pos: stop_pos = lead_stop_pos
-
-        if stop_pos != -1.0:
-            dist_to_stop = abs(stop_pos - v.position)
-            if dist_to_stop < 1.0:
-                v.speed = 0.0
-                v.position = stop_pos
-            elif dist_to_stop < 150.0:
-                safe_speed = (2 * config.DECELERATION * dist_to_stop) ** 0.5 * 0.8
-                if v.speed > safe_speed:
-                    required_decel = (v.speed ** 2) / (2 * dist_to_stop)
-                    actual_decel = min(config.DECELERATION * 1.5, required_decel)
-                    v.speed -= actual_decel * dt
-                    if v.speed < 0: v.speed = 0.0
-                else:
-                    if v.speed < target_speed and v.speed < safe_speed * 0.9:
-                            v.speed += config.ACCELERATION * dt
-        else:
-            if v.speed < target_speed:
-                v.speed += config.ACCELERATION * dt
-                if v.speed > target_speed: v.speed = target_speed
-
-        move_amount = v.speed * dt
-        if direction in ["east", "south"]:
-            new_pos = v.position + move_amount
-            if stop_pos != -1.0 and new_pos > stop_pos:
-                new_pos = stop_pos
-                v.speed = 0.0
-            v.position = new_pos
-        else:
-            new_pos = v.position - move_amount
-            if stop_pos != -1.0 and new_pos < stop_pos:
-                new_pos = stop_pos
-                v.speed = 0.0
-            v.position = new_pos
-
-    def _get_upcoming_intersection_info(self, v):
-        try: idx = int(v.laneId[1:])
-        except: return None, 9999.0
-
-        if v.laneType == "horizontal":
-            row = idx
-            target_col = -1
-            dist = 9999.0
-            for col in range(5):
-                intersection_pos = col * config.INTERSECTION_SPACING
-                if v.direction == "east":
-                     if intersection_pos > v.position:
-                         d = intersection_pos - v.position
-                         if d < dist:
-                             dist = d
-                             target_col = col
-                else:
-                     if intersection_pos < v.position:
-                         d = v.position - intersection_pos
-                         if d < dist:
-                             dist = d
-                             target_col = col
-            if target_col != -1 and dist < config.INTERSECTION_SPACING:
-                 iid = f"I-{100 + (row * 5) + target_col + 1}"
-                 return self.state.intersections.get(iid), dist
-        else:
-            col = idx
-            target_row = -1
-            dist = 9999.0
-            for row in range(5):
-                intersection_pos = row * config.INTERSECTION_SPACING
-                if v.direction == "south":
-                     if intersection_pos > v.position:
-                         d = intersection_pos - v.position
-                         if d < dist:
-                             dist = d
-                             target_row = row
-                else:
-                     if intersection_pos < v.position:
-                         d = v.position - intersection_pos
-                         if d < dist:
-                             dist = d
-                             target_row = row
-            if target_row != -1 and dist < config.INTERSECTION_SPACING:
-                 iid = f"I-{100 + (target_row * 5) + col + 1}"
-                 return self.state.intersections.get(iid), dist
-        return None, 9999.0
-
-    def _get_intersection_pos(self, v, intersection):
-        try:
-            idx = int(intersection.id.split("-")[1]) - 101
-            row = idx // 5
-            col = idx % 5
-            if v.laneType == "horizontal": return float(col * config.INTERSECTION_SPACING)
-            else: return float(row * config.INTERSECTION_SPACING)
-        except: return 0.0
+        va = self.state.vehicles
+        if va.count == 0: return
+
+        # Group live slots by lane and direction, leader (furthest along) first. A vehicle never
+        # passes its leader, so the order only needs rebuilding after a spawn or an exit.
+        perm = self._perm[:va.count]
+        if not self._order_valid:
+            group_by_lane(va.lane_id_int, va.dir_sign, va.pos, va.alive, self._group_count, self._group_offset, perm)
+            self._order_valid = True
+
+        tbl = self.state.intersections
+        self._step_vehicles(
+            va.pos, va.speed, va.target_speed, va.lane_id_int, va.dir_sign, va.lane_type, va.alive,
+            tbl.stop_bits, tbl.centre, self._next_int_idx,
+            perm, self._group_offset, dt
+        )
+
+        # Respawn Logic: vehicles that left the grid free their slots
+        left = perm[~va.alive[perm]]
+        if left.size:
+            np.subtract.at(self._lane_counts, va.lane_id_int[left], 1)
+            va.release(left)
+            self._order_valid = False
 
     def _update_emergency_vehicle(self, dt):
         pass # Stub for Phase 1
@@ -268,58 +181,87 @@ class SimulationKernel:
     def start_emergency(self): pass
     def stop_emergency(self): pass
 
-    def get_state(self) -> GridState:
-        return GridState(
-            intersections=list(self.state.intersections.values()),
-            vehicles=self.state.vehicles,
-            emergency=self.state.emergency_vehicle
+    def _publish(self):
+        """Copies the finished tick's columns into a new snapshot and swaps it in with a single rebind.
+        Models are not built here, only when a reader asks for them."""
+        ev = self.state.emergency_vehicle
+        self._snapshot = StateSnapshot(
+            tick_id=self.state.tick_id,
+            intersections=self.state.intersections.columns(),
+            vehicles=self.state.vehicles.columns(),
+            emergency=ev.model_copy(deep=True) if ev is not None else None,
+            lane_counts=self._lane_counts.copy()
+        )
+
+    def snapshot(self) -> StateSnapshot:
+        """Latest published state. Readers should take it once per request and read only from it."""
+        if self._snapshot is None: self._publish()
+        return self._snapshot
+
+    def _grid_of(self, snap: StateSnapshot) -> GridState:
+        """GridState for snap, built at most once per published snapshot."""
+        cached_snap, grid = self._grid_state
+        if cached_snap is snap: return grid
+        grid = GridState.model_construct(
+            intersections=snap.intersections.to_models(),
+            vehicles=snap.vehicles.to_models(),
+            emergency=snap.emergency
         )
+        self._grid_state = (snap, grid)
+        return grid
+
+    def get_state(self) -> GridState:
+        return self._grid_of(self.snapshot())
+
+    def get_state_json(self) -> bytes:
+        """get_state() as JSON, serialized at most once per published snapshot."""
+        snap = self.snapshot()
+        cached_snap, data = self._state_json
+        if cached_snap is snap: return data
+        data = self._grid_of(snap).model_dump_json().encode()
+        self._state_json = (snap, data)
+        return data
+
+    def get_intersection(self, intersection_id: str) -> Optional[Intersection]:
+        idx = self.state.intersections.index(intersection_id)
+        if idx is None: return None
+        return self.snapshot().intersections.to_model(idx)
 
     def get_intersection_details(self, intersection_id: str):
-        intersection = self.state.intersections.get(intersection_id)
-        if not intersection: return None
+        inter = self.get_intersection(intersection_id)
+        if inter is None: return None
         phase = "All-Red"
-        if intersection.nsSignal == SignalState.GREEN: phase = "NS"
-        elif intersection.ewSignal == SignalState.GREEN: phase = "EW"
-        elif intersection.nsSignal == SignalState.YELLOW: phase = "NS-Yellow"
-        elif intersection.ewSignal == SignalState.YELLOW: phase = "EW-Yellow"
+        if inter.nsSignal == SignalState.GREEN: phase = "NS"
+        elif inter.ewSignal == SignalState.GREEN: phase = "EW"
+        elif inter.nsSignal == SignalState.YELLOW: phase = "NS-Yellow"
+        elif inter.ewSignal == SignalState.YELLOW: phase = "EW-Yellow"
         return {
-            "intersectionId": intersection.id,
-            "nsGreenTime": int(intersection.nsGreenTime),
-            "ewGreenTime": int(intersection.ewGreenTime),
+            "intersectionId": intersection_id,
+            "nsGreenTime": int(inter.nsGreenTime),
+            "ewGreenTime": int(inter.ewGreenTime),
             "currentPhase": phase,
-            "timerRemaining": max(0, int(intersection.timer)),
+            "timerRemaining": max(0, int(inter.timer)),
             "flowRate": 500,
             "pedestrianDemand": "Low",
-            "aiEnabled": (intersection.mode == IntersectionMode.AI_OPTIMIZED)
+            "aiEnabled": inter.mode == IntersectionMode.AI_OPTIMIZED
         }
 
     def get_grid_overview(self):
-        roads = []
-        all_lanes = [f"H{i}" for i in range(5)] + [f"V{i}" for i in range(5)]
-        lane_congestions = {}
-        for lane_id in all_lanes:
-            vehicles = self._vehicle_lane_cache.get(lane_id, [])
-            count = len(vehicles)
-            congestion = min(1.0, count / 3.0)
-            lane_congestions[lane_id] = congestion
-            status = "optimal"
-            if congestion >= 0.75: status = "congested"
-            elif congestion >= 0.5: status = "moderate"
-            roads.append(RoadOverview(laneId=lane_id, congestion=round(congestion, 2), flow=status))
-
-        zones_map = {
-            "North Industrial": ["H0", "H1", "V0", "V4"],
-            "Central District": ["H2", "H3", "V2", "V3"],
-            "West Harbor": ["V0", "V1", "H4"]
-        }
-        zones = []
-        for name, lanes in zones_map.items():
-            total_load = sum(lane_congestions.get(l, 0.0) for l in lanes)
-            avg_load = total_load / max(1, len(lanes))
-            status = "optimal"
-            if avg_load >= 0.75: status = "congested"
-            elif avg_load >= 0.5: status = "moderate"
-            zones.append(ZoneOverview(name=name, load=round(avg_load, 2), status=status))
-
-        return GridOverview(roads=roads, zones=zones)
+        snap = self.snapshot()
+        if self._overview_tick == snap.tick_id: return self._overview_cache
+        congestion = np.minimum(1.0, snap.lane_counts / 3.0)
+        zones_load = (self._zones_matrix @ congestion) / self._zones_lane_counts
+        roads = [
+            RoadOverview.model_construct(laneId=lane_id, congestion=round(load, 2), flow=FLOW_STATUS[status])
+            for lane_id, load, status in zip(LANE_IDS, congestion.tolist(), _flow_status(congestion).tolist())
+        ]
+        zones = [
+            ZoneOverview.model_construct(name=name, load=round(load, 2), status=FLOW_STATUS[status])
+            for name, load, status in zip(ZONES, zones_load.tolist(), _flow_status(zones_load).tolist())
+        ]
+        self._overview_cache = GridOverview.model_construct(roads=roads, zones=zones)
+        self._overview_tick = snap.tick_id
+        return self._overview_cache
+
+def _flow_status(load: np.ndarray) -> np.ndarray:
+    return np.where(load >= 0.75, 2, np.where(load >= 0.5, 1, 0))
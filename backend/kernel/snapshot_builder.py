@@ -1,24 +1,27 @@
 from typing import Any, Dict
 from backend.domain.state import SimulationState
+from backend.domain.intersection_table import SIGNAL_STATES
+from backend.domain.vehicle_array import vehicle_id
 
 class SnapshotBuilder:
     def build(self, state: SimulationState) -> Dict[str, Any]:
+        slots = state.vehicles.live_slots()
         return {
             "tick": state.tick_id,
             "time": state.time,
             "vehicles": [
                 {
-                    "id": v.id,
-                    "pos": v.position, # To be derived from edge progress
-                    "edge": v.edge_id
+                    "id": vehicle_id(vid),
+                    "pos": pos, # To be derived from edge progress
+                    "edge": None
                 }
-                for v in state.vehicles
+                for vid, pos in zip(state.vehicles.vid[slots].tolist(), state.vehicles.pos[slots].tolist())
             ],
             "intersections": [
                 {
-                    "id": i.id,
-                    "state": i.nsSignal
+                    "id": intersection_id,
+                    "state": SIGNAL_STATES[ns_sig]
                 }
-                for i in state.intersections.values()
+                for intersection_id, ns_sig in zip(state.intersections.ids, state.intersections.ns_sig)
             ]
         }
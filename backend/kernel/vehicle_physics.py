@@ -0,0 +1,137 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; the kernels run as plain Python without it
+    def njit(*args, **kwargs):
+        def decorator(fn): return fn
+        return decorator
+
+def make_step_kernel(acc, dec, min_gap, stop_offset, spacing, grid_min, grid_max,
+                     braking_dist, safe_speed_factor, max_brake_factor, approach_speed_factor, snap_dist):
+    """Builds step_vehicles with the physics and grid constants captured as compile-time constants.
+
+    Numba keys its on-disk cache on the captured values, so each configuration compiles once and later
+    processes load it from the cache.
+    """
+    # Braking compares squared speeds (v >= 0): safe speed^2 = 2 * dec * dist * safe_speed_factor^2
+    safe_speed_sq_per_dist = 2 * dec * safe_speed_factor * safe_speed_factor
+    approach_sq = approach_speed_factor * approach_speed_factor
+    max_decel = dec * max_brake_factor
+
+    @njit(cache=True, fastmath=True, nogil=True)
+    def step_vehicles(pos, speed, target_speed, lane_id_int, dir_sign, lane_type, alive, stop_bits, int_centre,
+                      next_int_idx, perm, group_offset, dt):
+        """Advances every vehicle one tick in place, clearing alive[i] for vehicles that leave the grid.
+
+        Walks the groups produced by group_by_lane leader first, so each vehicle's leader is the one
+        visited just before it and a follower always sees its leader's updated position. Signal stop,
+        lead gap, braking, integration and the bounds check all happen in this single pass.
+        """
+        for g in range(group_offset.shape[0] - 1):
+            start = group_offset[g]
+            for k in range(start, group_offset[g + 1]):
+                i = perm[k]
+                sign = dir_sign[i]
+                p = pos[i]
+                v = speed[i]
+                has_stop = False
+                stop_pos = 0.0
+
+                # Signal at the next intersection along the travel axis
+                forward = 1 if sign > 0 else 0
+                cell = int((p - grid_min) // spacing)
+                row = -1
+                if cell >= 0 and cell < next_int_idx.shape[2]: row = next_int_idx[lane_id_int[i], forward, cell]
+                if row >= 0:
+                    axis = lane_type[i]
+                    center_pos = int_centre[axis, row]
+                    dist_to_int = sign * (center_pos - p)
+                    if dist_to_int > 0.0 and dist_to_int < spacing and (stop_bits[row] >> axis) & 1:
+                        has_stop = True
+                        stop_pos = center_pos - sign * stop_offset
+
+                if k > start:
+                    lead_stop_pos = pos[perm[k - 1]] - sign * min_gap
+                    if not has_stop or sign * lead_stop_pos < sign * stop_pos:
+                        has_stop = True
+                        stop_pos = lead_stop_pos
+
+                if has_stop:
+                    dist_to_stop = abs(stop_pos - p)
+                    if dist_to_stop < snap_dist:
+                        v = 0.0
+                        p = stop_pos
+                    elif dist_to_stop < braking_dist:
+                        safe_speed_sq = safe_speed_sq_per_dist * dist_to_stop
+                        v_sq = v * v
+                        if v_sq > safe_speed_sq:
+                            actual_decel = min(max_decel, v_sq / (2 * dist_to_stop))
+                            v -= actual_decel * dt
+                            if v < 0.0: v = 0.0
+                        elif v < target_speed[i] and v_sq < approach_sq * safe_speed_sq:
+                            v += acc * dt
+                elif v < target_speed[i]:
+                    v = min(v + acc * dt, target_speed[i])
+
+                p += sign * v * dt
+                if has_stop and sign * (p - stop_pos) > 0.0:
+                    p = stop_pos
+                    v = 0.0
+
+                pos[i] = p
+                speed[i] = v
+                alive[i] = p >= grid_min and p <= grid_max
+
+    return step_vehicles
+
+@njit(cache=True, nogil=True)
+def group_by_lane(lane_id_int, dir_sign, pos, alive, group_count, group_offset, perm):
+    """Counting-sorts live slots into lane_id_int * 2 + (dir_sign > 0) groups, leader first within each.
+
+    Scans every slot and skips those not alive. Writes the visiting order to perm[:n_alive] and group
+    bounds to group_offset. All buffers are preallocated by the caller, nothing is allocated per tick.
+    """
+    n = pos.shape[0]
+    n_groups = group_count.shape[0]
+    group_count[:] = 0
+    for i in range(n):
+        if not alive[i]: continue
+        group_count[lane_id_int[i] * 2 + (1 if dir_sign[i] > 0 else 0)] += 1
+    group_offset[0] = 0
+    for g in range(n_groups):
+        group_offset[g + 1] = group_offset[g] + group_count[g]
+
+    group_count[:] = 0
+    for i in range(n):
+        if not alive[i]: continue
+        g = lane_id_int[i] * 2 + (1 if dir_sign[i] > 0 else 0)
+        perm[group_offset[g] + group_count[g]] = i
+        group_count[g] += 1
+
+    for g in range(n_groups):
+        start = group_offset[g]
+        end = group_offset[g + 1]
+        # Stable insertion sort on distance travelled; groups hold a handful of vehicles
+        for a in range(start + 1, end):
+            j = perm[a]
+            key = pos[j] * dir_sign[j]
+            b = a - 1
+            while b >= start and pos[perm[b]] * dir_sign[perm[b]] < key:
+                perm[b + 1] = perm[b]
+                b -= 1
+            perm[b + 1] = j
+
+def warm_up(step_vehicles):
+    """Compiles (or loads from the on-disk cache) both kernels on empty inputs of the runtime dtypes,
+    so the first simulation tick does not stall on JIT compilation."""
+    f64 = np.zeros(0, dtype=np.float64)
+    i8 = np.zeros(0, dtype=np.int8)
+    i32 = np.zeros(0, dtype=np.int32)
+    i64 = np.zeros(0, dtype=np.int64)
+    u8 = np.zeros(0, dtype=np.uint8)
+    alive = np.zeros(0, dtype=bool)
+    group_offset = np.zeros(1, dtype=np.int64)
+    group_by_lane(i32, i8, f64, alive, i64, group_offset, i64)
+    step_vehicles(f64, f64, f64, i32, i8, i8, alive, u8, np.zeros((2, 0), dtype=np.float64), np.zeros((0, 2, 0), dtype=np.int32),
+                  i64, group_offset, 0.0)
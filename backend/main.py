@@ -1,8 +1,11 @@
 import asyncio
+import threading
 import time
-from fastapi import FastAPI, HTTPException
-from typing import List
+from types import MappingProxyType
+from fastapi import FastAPI, HTTPException, Response
+from typing import List, Optional
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 
 from backend.kernel.simulation_kernel import SimulationKernel
@@ -16,18 +19,30 @@ from backend.domain.models import (
     PatternUpdateResult, OptimizationResult
 )
 
-# Initialize Kernel
-kernel = SimulationKernel()
+# Kernel is created on first use, so importing this module doesn't build it (or compile its kernels)
+_kernel: Optional[SimulationKernel] = None
+
+def get_kernel() -> SimulationKernel:
+    global _kernel
+    if _kernel is None: _kernel = SimulationKernel()
+    return _kernel
+
+def queue_command(cmd):
+    """Queues a command for the next tick, answering 503 if the kernel's command ring is full"""
+    if not get_kernel().queue_command(cmd):
+        raise HTTPException(status_code=503, detail="Command queue full, retry later")
 
 # Background task for simulation loop
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Start the simulation loop
-    kernel.initialize() # Deterministic seed
-    loop_task = asyncio.create_task(run_simulation())
+    # Startup: Start the simulation loop on a worker thread so ticks don't block request handling
+    get_kernel().initialize() # Deterministic seed
+    stop = threading.Event()
+    loop_task = asyncio.create_task(asyncio.to_thread(run_simulation, stop))
     yield
     # Shutdown
-    loop_task.cancel()
+    stop.set()
+    await loop_task
 
 app = FastAPI(lifespan=lifespan)
 
@@ -39,32 +54,37 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Grid state payloads grow with the vehicle count
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
-async def run_simulation():
-    """Runs the simulation update loop at ~20Hz"""
+def run_simulation(stop: threading.Event):
+    """Runs the simulation update loop at ~20Hz until stop is set"""
     target_fps = 20
     dt = 1.0 / target_fps
+    kernel = get_kernel()
+    next_tick = time.monotonic()
     
-    while True:
-        start_time = time.time()
-        
+    while not stop.is_set():
         # Update simulation (deterministic tick)
         kernel.run_tick()
         
-        # Sleep to maintain frame rate
-        elapsed = time.time() - start_time
-        sleep_time = max(0.0, dt - elapsed)
-        await asyncio.sleep(sleep_time)
-
-@app.get("/api/grid/state", response_model=GridState)
+        # Sleep until the next deadline, waking early on shutdown; if we fell behind, don't try to catch up
+        next_tick += dt
+        sleep_time = next_tick - time.monotonic()
+        if sleep_time < 0:
+            next_tick -= sleep_time
+            sleep_time = 0.0
+        stop.wait(sleep_time)
+
+@app.get("/api/grid/state", responses={200: {"model": GridState}})
 async def get_grid_state():
     """Returns the current state of the simulation grid"""
-    return kernel.get_state()
+    return Response(content=get_kernel().get_state_json(), media_type="application/json")
 
 @app.get("/api/signals/{intersection_id}", response_model=SignalDetails)
 async def get_signal_state(intersection_id: str):
     """Returns the details of a specific intersection"""
-    details = kernel.get_intersection_details(intersection_id)
+    details = get_kernel().get_intersection_details(intersection_id)
     if not details:
         raise HTTPException(status_code=404, detail="Intersection not found")
     return details
@@ -73,14 +93,13 @@ async def get_signal_state(intersection_id: str):
 async def update_signal_timing(intersection_id: str, updates: SignalUpdate):
     """Updates the timing and mode of a specific intersection"""
     cmd = UpdateSignalCommand(intersection_id, updates)
-
     # Strictly queue the command for the next tick
-    kernel.queue_command(cmd)
+    queue_command(cmd)
 
     # Return the *current* state (pre-update) as a best-effort response
     # to maintain API contract without blocking or race conditions.
     # The update will apply on next tick.
-    intersection = kernel.state.intersections.get(intersection_id)
+    intersection = get_kernel().get_intersection(intersection_id)
     if not intersection:
         raise HTTPException(status_code=404, detail="Intersection not found")
     return intersection
@@ -89,19 +108,19 @@ async def update_signal_timing(intersection_id: str, updates: SignalUpdate):
 async def set_traffic_pattern(pattern: TrafficPattern):
     """Applies a global traffic pattern to all intersections"""
     cmd = ApplyTrafficPatternCommand(pattern.pattern)
-    kernel.queue_command(cmd)
-    return {"patternApplied": pattern.pattern, "intersectionsUpdated": 25}
+    queue_command(cmd)
+    return {"patternApplied": pattern.pattern, "intersectionsUpdated": len(get_kernel().state.intersections)}
 
 @app.post("/api/signals/optimize-all", response_model=OptimizationResult)
 async def optimize_all_signals():
     """Triggers immediate AI optimization for all intersections"""
-    return {"optimized": 25, "status": "success (queued)"}
+    return {"optimized": len(get_kernel().state.intersections), "status": "success (queued)"}
 
 @app.post("/api/signals/ai")
 async def toggle_ai_mode(toggle: AIToggle):
     """Toggles AI optimization mode for all intersections"""
     cmd = SetGlobalAIModeCommand(toggle.enabled)
-    kernel.queue_command(cmd)
+    queue_command(cmd)
     return {"status": "AI Mode Updated", "enabled": toggle.enabled}
 
 @app.post("/api/emergency/start")
@@ -109,10 +128,12 @@ async def start_emergency():
     """Starts an emergency vehicle simulation"""
     try:
         cmd = StartEmergencyCommand()
-        kernel.queue_command(cmd)
+        queue_command(cmd)
         # Mock response to satisfy API contract until next tick
         mock_ev = {"id": "EM-1", "active": True, "position": -50.0, "laneId": "H0", "speed": 35.0, "route": [], "current_target_index": 0, "type": "emergency"}
         return {"status": "Emergency Started", "vehicle": mock_ev}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -120,36 +141,43 @@ async def start_emergency():
 async def stop_emergency():
     """Stops the emergency vehicle simulation"""
     cmd = StopEmergencyCommand()
-    kernel.queue_command(cmd)
+    queue_command(cmd)
     return {"status": "Emergency Stopped"}
 
 @app.get("/api/emergency/state")
 async def get_emergency_state():
     """Returns the state of the emergency vehicle"""
-    return {"emergency": kernel.state.emergency_vehicle}
+    return {"emergency": get_kernel().snapshot().emergency}
+
+# Built once and shared between requests, keyed by whether AI mode is on; read-only views so handlers can't mutate them
+AI_STATUS_RESPONSES = {
+    enabled: MappingProxyType({
+        "congestionLevel": "Low",
+        "prediction": MappingProxyType({"location": "--", "time": 0}),
+        "recommendation": MappingProxyType({"action": "Monitor", "value": "--"}),
+        "efficiency": 0,
+        "aiActive": enabled
+    })
+    for enabled in (False, True)
+}
 
 @app.get("/api/ai/status")
 async def get_ai_status():
     """Returns the status of the AI Traffic Decision Engine"""
-    return {
-        "congestionLevel": "Low",
-        "prediction": {"location": "--", "time": 0},
-        "recommendation": {"action": "Monitor", "value": "--"},
-        "efficiency": 0,
-        "aiActive": kernel.state.ai_enabled
-    }
+    return AI_STATUS_RESPONSES[bool(get_kernel().state.ai_enabled)]
 
 @app.get("/api/grid/overview", response_model=GridOverview)
 async def get_grid_overview():
     """Returns aggregated grid information for visualization"""
-    return kernel.get_grid_overview()
+    return get_kernel().get_grid_overview()
 
 @app.get("/api/intersections", response_model=List[IntersectionSummary])
 async def get_intersections():
     """Returns a list of all intersections with their status"""
     summary = []
-    if kernel.state.intersections:
-        for i_id in sorted(kernel.state.intersections.keys()):
+    intersections = get_kernel().state.intersections
+    if intersections:
+        for i_id in sorted(intersections.ids):
             summary.append({"id": i_id, "name": f"Intersection {i_id}", "status": "active"})
     return summary
 
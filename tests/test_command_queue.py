@@ -0,0 +1,36 @@
+import unittest
+from backend.kernel.command_queue import CommandQueue
+
+class TestCommandQueue(unittest.TestCase):
+    def test_order_across_wrap_around(self):
+        queue = CommandQueue(slots=4)
+        for i in range(3): self.assertTrue(queue.add(i))
+        self.assertEqual(list(queue.drain()), [0, 1, 2])
+        # head and tail now sit past the end of the ring, so these wrap
+        for i in range(3, 7): self.assertTrue(queue.add(i))
+        self.assertEqual(list(queue.drain()), [3, 4, 5, 6])
+        self.assertEqual(len(queue), 0)
+
+    def test_refuses_when_full(self):
+        queue = CommandQueue(slots=2)
+        self.assertTrue(queue.add("a"))
+        self.assertTrue(queue.add("b"))
+        self.assertFalse(queue.add("c"))
+        self.assertEqual(len(queue), 2)
+        self.assertEqual(list(queue.drain()), ["a", "b"])
+        self.assertTrue(queue.add("d"))
+
+    def test_drain_stops_at_head_when_started(self):
+        queue = CommandQueue(slots=8)
+        queue.add(0)
+        queue.add(1)
+        drained = []
+        for cmd in queue.drain():
+            drained.append(cmd)
+            # Commands queued while draining wait for the next drain
+            queue.add(cmd + 10)
+        self.assertEqual(drained, [0, 1])
+        self.assertEqual(list(queue.drain()), [10, 11])
+
+if __name__ == '__main__':
+    unittest.main()
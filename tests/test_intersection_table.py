@@ -0,0 +1,46 @@
+import unittest
+from backend.domain import config
+from backend.domain.intersection_table import (
+    RED, YELLOW, GREEN, PHASE_TABLE, TIMER_YELLOW, TIMER_NS_GREEN, TIMER_EW_GREEN, build_next_intersection_index
+)
+
+def cascade_phase(ns, ew):
+    """The if/elif phase cascade PHASE_TABLE replaced, returning (ns, ew, timer source)."""
+    if ns == GREEN: return YELLOW, ew, TIMER_YELLOW
+    elif ns == YELLOW: return RED, GREEN, TIMER_EW_GREEN
+    elif ew == GREEN: return ns, YELLOW, TIMER_YELLOW
+    elif ew == YELLOW: return GREEN, RED, TIMER_NS_GREEN
+    elif ns == RED and ew == RED: return GREEN, ew, TIMER_NS_GREEN
+
+class TestIntersectionTable(unittest.TestCase):
+    def test_phase_table_matches_cascade(self):
+        for ns in (RED, YELLOW, GREEN):
+            for ew in (RED, YELLOW, GREEN):
+                with self.subTest(ns=ns.name, ew=ew.name):
+                    self.assertEqual(tuple(PHASE_TABLE[ns, ew].tolist()), cascade_phase(ns, ew))
+
+    def test_next_intersection_index(self):
+        size = config.GRID_SIZE
+        spacing = config.INTERSECTION_SPACING
+        table = build_next_intersection_index()
+        positions = [config.GRID_BOUNDS_MIN, -50.0, -0.5, 0.0, 0.5, 99.999, 100.0, 250.0,
+                     (size - 1) * spacing - 0.5, (size - 1) * spacing, (size - 1) * spacing + 0.5, config.GRID_BOUNDS_MAX]
+        for lane in range(2 * size):
+            lane_idx = lane % size
+            for forward in (0, 1):
+                for pos in positions:
+                    # Nearest intersection strictly ahead and closer than one spacing, as the old linear scan found it
+                    ahead = [k for k in range(size) if 0 < (k * spacing - pos if forward else pos - k * spacing) < spacing]
+                    expected = -1
+                    if ahead:
+                        expected = lane_idx * size + ahead[0] if lane < size else ahead[0] * size + lane_idx
+                    # The kernel reads the table, then applies the same distance window
+                    row = table[lane, forward, int((pos - config.GRID_BOUNDS_MIN) // spacing)]
+                    if row >= 0:
+                        centre = (row % size if lane < size else row // size) * spacing
+                        if not 0 < (centre - pos if forward else pos - centre) < spacing: row = -1
+                    with self.subTest(lane=lane, forward=forward, pos=pos):
+                        self.assertEqual(row, expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import numpy as np
+from backend.kernel.simulation_kernel import SimulationKernel
+
+class TestSnapshot(unittest.TestCase):
+    def test_published_snapshot_is_immutable(self):
+        kernel = SimulationKernel()
+        kernel.initialize(seed=42)
+        for _ in range(10):
+            kernel.run_tick()
+
+        snap = kernel.snapshot()
+        data = kernel.get_state_json()
+        pos = snap.vehicles.pos.copy()
+        speed = snap.vehicles.speed.copy()
+        timer = snap.intersections.timer.copy()
+        ns_sig = snap.intersections.ns_sig.copy()
+
+        for _ in range(50):
+            kernel.run_tick()
+
+        self.assertIsNot(kernel.snapshot(), snap)
+        self.assertFalse(np.array_equal(kernel.snapshot().intersections.timer, timer))
+        np.testing.assert_array_equal(snap.vehicles.pos, pos)
+        np.testing.assert_array_equal(snap.vehicles.speed, speed)
+        np.testing.assert_array_equal(snap.intersections.timer, timer)
+        np.testing.assert_array_equal(snap.intersections.ns_sig, ns_sig)
+        # Rebuilding the old snapshot's models gives the JSON served for it at the time
+        self.assertEqual(kernel._grid_of(snap).model_dump_json().encode(), data)
+
+    def test_reads_are_cached_per_snapshot(self):
+        kernel = SimulationKernel()
+        kernel.initialize(seed=42)
+        kernel.run_tick()
+
+        self.assertIs(kernel.get_state(), kernel.get_state())
+        self.assertIs(kernel.get_state_json(), kernel.get_state_json())
+        self.assertIs(kernel.get_grid_overview(), kernel.get_grid_overview())
+
+        state = kernel.get_state()
+        kernel.run_tick()
+        self.assertIsNot(kernel.get_state(), state)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import numpy as np
+from backend.domain import config
+from backend.domain.intersection_table import IntersectionTable, build_next_intersection_index
+from backend.domain.vehicle_array import VehicleArray
+from backend.kernel.simulation_kernel import SimulationKernel
+from backend.kernel.vehicle_physics import make_step_kernel, group_by_lane
+
+step_vehicles = make_step_kernel(
+    config.ACCELERATION, config.DECELERATION, config.MIN_GAP, config.STOP_OFFSET,
+    config.INTERSECTION_SPACING, config.GRID_BOUNDS_MIN, config.GRID_BOUNDS_MAX,
+    config.BRAKING_DISTANCE, config.SAFE_SPEED_FACTOR, config.MAX_BRAKE_FACTOR,
+    config.APPROACH_SPEED_FACTOR, config.STOP_SNAP_DISTANCE
+)
+NEXT_INT_IDX = build_next_intersection_index()
+
+class TestVehiclePhysics(unittest.TestCase):
+    def setUp(self):
+        self.tbl = IntersectionTable(ids=tuple(f"I-{100 + i}" for i in range(1, config.GRID_SIZE ** 2 + 1)))
+        self.tbl.update_stop_bits()  # all signals red
+        self.va = VehicleArray(capacity=4)
+
+    def add(self, lane, sign, pos, speed, target_speed):
+        self.va.extend(np.array([lane]), np.array([sign]), np.array([pos]), np.array([speed]), np.array([target_speed]))
+
+    def step(self, dt=0.05):
+        va = self.va
+        n_groups = 4 * config.GRID_SIZE
+        group_count = np.zeros(n_groups, dtype=np.int64)
+        group_offset = np.zeros(n_groups + 1, dtype=np.int64)
+        perm = np.zeros(va.count, dtype=np.int64)
+        group_by_lane(va.lane_id_int, va.dir_sign, va.pos, va.alive, group_count, group_offset, perm)
+        step_vehicles(va.pos, va.speed, va.target_speed, va.lane_id_int, va.dir_sign, va.lane_type, va.alive,
+                      self.tbl.stop_bits, self.tbl.centre, NEXT_INT_IDX, perm, group_offset, dt)
+
+    def test_stops_at_red_signal(self):
+        # H0 eastbound towards I-102 (centre 100), stop line at 65
+        self.add(0, 1, 20.0, 15.0, 15.0)
+        stop_line = config.INTERSECTION_SPACING - config.STOP_OFFSET
+        for _ in range(200):
+            self.step()
+            self.assertLessEqual(self.va.pos[0], stop_line)
+        self.assertEqual(self.va.pos[0], stop_line)
+        self.assertEqual(self.va.speed[0], 0.0)
+
+    def test_clamps_to_lead_gap(self):
+        # Leader waits on the stop line; with dt = 1 the follower would overshoot the gap and is clamped
+        stop_line = config.INTERSECTION_SPACING - config.STOP_OFFSET
+        self.add(0, 1, stop_line, 0.0, 0.0)
+        self.add(0, 1, 45.0, 15.0, 15.0)
+        self.step(dt=1.0)
+        self.assertEqual(self.va.pos[0], stop_line)
+        self.assertEqual(self.va.pos[1], stop_line - config.MIN_GAP)
+        self.assertEqual(self.va.speed[1], 0.0)
+
+    def test_leaves_grid(self):
+        # H0 westbound past the western edge, with no intersection ahead
+        self.add(0, -1, config.GRID_BOUNDS_MIN + 1.0, 15.0, 15.0)
+        self.step(dt=0.2)
+        self.assertEqual(self.va.pos[0], config.GRID_BOUNDS_MIN - 2.0)
+        self.assertFalse(self.va.alive[0])
+
+class RegroupEveryTickKernel(SimulationKernel):
+    def _update_vehicles(self, dt):
+        self._order_valid = False
+        super()._update_vehicles(dt)
+
+class TestLaneOrderCache(unittest.TestCase):
+    def test_cached_order_matches_regrouping_every_tick(self):
+        # Vehicles never pass their leader, so keeping the lane order between spawns and exits must not
+        # change any trajectory compared with regrouping from scratch each tick
+        cached, fresh = SimulationKernel(), RegroupEveryTickKernel()
+        cached.initialize(seed=7)
+        fresh.initialize(seed=7)
+        exits = 0
+        for tick in range(600):
+            if tick % 40 == 0:
+                cached._spawn_batch(8)
+                fresh._spawn_batch(8)
+            before = len(cached.state.vehicles)
+            cached.run_tick()
+            fresh.run_tick()
+            exits += before > len(cached.state.vehicles)
+            a, b = cached.state.vehicles, fresh.state.vehicles
+            np.testing.assert_array_equal(a.alive, b.alive)
+            np.testing.assert_array_equal(a.pos[a.alive], b.pos[b.alive])
+            np.testing.assert_array_equal(a.speed[a.alive], b.speed[b.alive])
+        self.assertGreater(exits, 0)
+
+if __name__ == '__main__':
+    unittest.main()